@@ -13,24 +13,16 @@ release = "0.1.0"
 extensions = [
     "sphinx.ext.autodoc",
     "sphinx.ext.viewcode",
-    "sphinx_design",
     "sphinx.ext.napoleon",
-    "sphinx.ext.doctest",
     "sphinx_autodoc_typehints",
     "notfound.extension",  # Custom 404 pages for dead links
-    "nbsphinx",  # jupyter notebooks integration
-    "sphinxcontrib.mermaid",
-    "sphinx_togglebutton",
-    "sphinx-pydantic",  # Support for Pydantic models
-    "myst_nb",
+    "myst_parser",  # Markdown sources
 ]
 
-togglebutton_hint = ""
-togglebutton_hint_hide = ""
-
 myst_enable_extensions = ["colon_fence"]
 
-nbsphinx_requirejs_path = ""
+# Per-object TOC entries slow down large autodoc builds considerably
+toc_object_entries = False
 
 templates_path = ["_templates"]
 exclude_patterns = [
@@ -70,9 +62,6 @@ EXTRA_APIDOC_DIR = DOCS_DIR / "api_doc_override"
 # List of modules to document - customize this list for your project
 modules = []
 
-# Do not execute notebooks
-nbsphinx_execute = "never"
-
 def override_apidoc(_):
     """Override generated MD files with custom ones."""
     override_dir = EXTRA_APIDOC_DIR
@@ -80,15 +69,28 @@ def override_apidoc(_):
 
     for override_file in override_dir.glob("*.md"):
         output_file = output_dir / override_file.name
-        shutil.copy2(override_file, output_file)
+        src_stat = override_file.stat()
+        try:
+            dst_stat = output_file.stat()
+        except FileNotFoundError:
+            dst_stat = None
+        # Links and copy2 both keep mtime, so an unchanged override keeps Sphinx's cache warm
+        if dst_stat and (src_stat.st_mtime_ns, src_stat.st_size) == (dst_stat.st_mtime_ns, dst_stat.st_size):
+            continue
+        if dst_stat:
+            output_file.unlink()
+        try:
+            os.link(override_file, output_file)
+        except OSError:
+            # Cross-device or unsupported filesystem
+            shutil.copy2(override_file, output_file)
         print(f"Overriding {output_file} with {override_file}")
 
 def get_exclude_files(project_dir: Path, exclude_patterns: list) -> list:
     exclude_files = []
-    for pattern in exclude_patterns:
+    for pattern in dict.fromkeys(exclude_patterns):  # drop duplicate patterns, keep order
         full_pattern = str(project_dir / pattern)
-        matched_files = glob.glob(full_pattern, recursive=True)
-        for file in matched_files:
+        for file in glob.glob(full_pattern, recursive=True):
             file_path = Path(file)
             if file_path.is_file():
                 exclude_files.append(file_path)
@@ -4,17 +4,21 @@ import json
 import shutil
 from pathlib import Path
 import pytest
+import typer
+from click.testing import CliRunner
 from rich.console import Console
 
+# Imported here so the CLI stack is loaded once per worker during collection
+from wanpc.cli import app
+
 @pytest.fixture
-def temp_home(tmp_path):
+def temp_home(tmp_path, monkeypatch):
     """Create a temporary home directory for tests."""
-    old_home = Path.home()
     home_dir = tmp_path / "home"
     home_dir.mkdir()
-    Path.home = lambda: home_dir
-    yield home_dir
-    Path.home = lambda: old_home
+    monkeypatch.setenv("HOME", str(home_dir))
+    monkeypatch.setenv("USERPROFILE", str(home_dir))
+    return home_dir
 
 @pytest.fixture
 def temp_config(temp_home):
@@ -23,11 +27,10 @@ def temp_config(temp_home):
     config_dir.mkdir()
     return config_dir
 
-@pytest.fixture
-def temp_template(tmp_path):
-    """Create a temporary cookiecutter template."""
-    template_dir = tmp_path / "template"
-    template_dir.mkdir()
+@pytest.fixture(scope="session")
+def _canonical_template(tmp_path_factory):
+    """Build the cookiecutter template once per test session."""
+    template_dir = tmp_path_factory.mktemp("template")
     
     # Create cookiecutter.json
     cookiecutter_json = {
@@ -37,17 +40,61 @@ def temp_template(tmp_path):
         "license": "MIT"
     }
     
-    with open(template_dir / "cookiecutter.json", "w") as f:
-        json.dump(cookiecutter_json, f, indent=2)
+    (template_dir / "cookiecutter.json").write_text(json.dumps(cookiecutter_json, separators=(",", ":")))
     
     # Create template structure
-    (template_dir / "{{cookiecutter.project_name}}").mkdir()
-    with open(template_dir / "{{cookiecutter.project_name}}" / "README.md", "w") as f:
-        f.write("# {{cookiecutter.project_name}}\n\nBy {{cookiecutter.author}}")
+    project_dir = template_dir / "{{cookiecutter.project_name}}"
+    project_dir.mkdir(parents=True)
+    (project_dir / "README.md").write_text(
+        "# {{cookiecutter.project_name}}\n\nBy {{cookiecutter.author}}\n\nLicense: {{cookiecutter.license}}"
+    )
     
     return template_dir
 
 @pytest.fixture
+def temp_template(_canonical_template, tmp_path):
+    """Create a temporary cookiecutter template copied from the canonical one."""
+    return Path(shutil.copytree(_canonical_template, tmp_path / "template"))
+
+@pytest.fixture(scope="session")
 def console():
     """Create a Rich console for testing."""
-    return Console()
+    return Console(force_terminal=False, width=80)
+
+@pytest.fixture(scope="session")
+def cli():
+    """Build the Click command tree for the wanpc Typer app once per session."""
+    return typer.main.get_command(app)
+
+@pytest.fixture(autouse=True)
+def _wide_app_console(monkeypatch):
+    """Fix the width of the CLI's module-level console for every test."""
+    # Rich reads COLUMNS once, when wanpc.cli is imported during collection, so the
+    # runner's env can't widen it; narrow xdist workers would wrap long paths
+    import wanpc.cli
+    monkeypatch.setattr(wanpc.cli.console, "width", 200)
+
+@pytest.fixture(scope="session")
+def runner():
+    """Create a CLI runner shared by the whole test session."""
+    # Plain, wide output for Typer's per-call help and error consoles; the app's own
+    # console is widened by _wide_app_console
+    return CliRunner(env={"NO_COLOR": "1", "TERM": "dumb", "COLUMNS": "200"})
+
+@pytest.fixture
+def configured_template(temp_config, temp_template):
+    """Register the temporary template in the config without going through the CLI."""
+    from wanpc.config import Config
+    config = Config()
+    config._config = {
+        "templates": {
+            "test-template": {
+                "path": str(temp_template),
+                "defaults": {},
+                "description": "Test template"
+            }
+        },
+        "global_defaults": {}
+    }
+    config._save_config()
+    return config
@@ -1,27 +1,28 @@
 """Tests for CLI functionality."""
 
+import os
 from pathlib import Path
 import pytest
-from typer.testing import CliRunner
-from wanpc.cli import app
+from wanpc.config import Config
 
-runner = CliRunner()
+# Accept the cookiecutter default for every prompt raised by `create`
+ACCEPT_DEFAULTS = "\n" * 4
 
-def test_list_empty_config(temp_config):
+def test_list_empty_config(runner, cli, temp_config):
     """Test listing templates when no templates exist."""
-    result = runner.invoke(app, ["list"])
+    result = runner.invoke(cli, ["list"])
     assert result.exit_code == 0
     assert "No templates configured" in result.stdout
 
-def test_config_show_empty(temp_config):
+def test_config_show_empty(runner, cli, temp_config):
     """Test showing empty configuration."""
-    result = runner.invoke(app, ["config", "show"])
+    result = runner.invoke(cli, ["config", "show"])
     assert result.exit_code == 0
     assert "No configuration found" in result.stdout
 
-def test_config_add_template(temp_config, temp_template):
+def test_config_add_template(runner, cli, temp_config, temp_template):
     """Test adding a template."""
-    result = runner.invoke(app, [
+    result = runner.invoke(cli, [
         "config", "add-template",
         "--name", "test-template",
         "--path", str(temp_template),
@@ -31,21 +32,14 @@ def test_config_add_template(temp_config, temp_template):
     assert "Added template" in result.stdout
 
     # Verify template was added
-    result = runner.invoke(app, ["list"])
+    result = runner.invoke(cli, ["list"])
     assert "test-template" in result.stdout
     assert "Test template" in result.stdout
 
-def test_config_set_description(temp_config, temp_template):
+def test_config_set_description(runner, cli, configured_template):
     """Test setting template description."""
-    # First add a template
-    runner.invoke(app, [
-        "config", "add-template",
-        "--name", "test-template",
-        "--path", str(temp_template)
-    ])
-    
     # Set description
-    result = runner.invoke(app, [
+    result = runner.invoke(cli, [
         "config", "set-description",
         "--name", "test-template",
         "--description", "Updated description"
@@ -54,20 +48,15 @@ def test_config_set_description(temp_config, temp_template):
     assert "Updated description" in result.stdout
 
     # Verify description was updated
-    result = runner.invoke(app, ["list"])
+    configured_template.load()
+    assert configured_template._config["templates"]["test-template"]["description"] == "Updated description"
+    result = runner.invoke(cli, ["list"])
     assert "Updated description" in result.stdout
 
-def test_config_set_default(temp_config, temp_template):
+def test_config_set_default(runner, cli, configured_template):
     """Test setting template-specific default."""
-    # Add template
-    runner.invoke(app, [
-        "config", "add-template",
-        "--name", "test-template",
-        "--path", str(temp_template)
-    ])
-    
     # Set default
-    result = runner.invoke(app, [
+    result = runner.invoke(cli, [
         "config", "set-default",
         "--name", "test-template",
         "--key", "author",
@@ -76,12 +65,14 @@ def test_config_set_default(temp_config, temp_template):
     assert result.exit_code == 0
     
     # Verify default was set
-    result = runner.invoke(app, ["list", "--show-defaults"])
+    configured_template.load()
+    assert configured_template._config["templates"]["test-template"]["defaults"]["author"] == "Test Author"
+    result = runner.invoke(cli, ["list", "--show-defaults"])
     assert "Test Author" in result.stdout
 
-def test_config_set_global_default(temp_config):
+def test_config_set_global_default(runner, cli, temp_config):
     """Test setting global default."""
-    result = runner.invoke(app, [
+    result = runner.invoke(cli, [
         "config", "set-global-default",
         "--key", "license",
         "--value", "MIT"
@@ -89,275 +80,177 @@ def test_config_set_global_default(temp_config):
     assert result.exit_code == 0
     
     # Verify global default was set
-    result = runner.invoke(app, ["config", "show"])
+    result = runner.invoke(cli, ["config", "show"])
     assert "MIT" in result.stdout
 
-def test_config_remove_template(temp_config, temp_template):
+def test_config_remove_template(runner, cli, configured_template):
     """Test removing a template."""
-    # Add template
-    runner.invoke(app, [
-        "config", "add-template",
-        "--name", "test-template",
-        "--path", str(temp_template)
-    ])
-    
-    # Remove template
-    result = runner.invoke(app, [
+    # Remove template, confirming the prompt
+    result = runner.invoke(cli, [
         "config", "remove-template",
         "--name", "test-template"
-    ])
+    ], input="y\n")
     assert result.exit_code == 0
     assert "Removed template" in result.stdout
     
     # Verify template was removed
-    result = runner.invoke(app, ["list"])
+    configured_template.load()
+    assert "test-template" not in configured_template._config["templates"]
+    result = runner.invoke(cli, ["list"])
     assert "test-template" not in result.stdout
 
-def test_create_project(temp_config, temp_template, tmp_path):
-    """Test creating a project from template."""
-    # Add template
-    runner.invoke(app, [
-        "config", "add-template",
-        "--name", "test-template",
-        "--path", str(temp_template)
-    ])
-    
-    # Create project
-    output_dir = tmp_path / "output"
-    result = runner.invoke(app, [
-        "create",
-        "test-template",
-        "--output-dir", str(output_dir)
-    ])
+def test_list_show_defaults(runner, cli, configured_template):
+    """Test listing templates with their template and applicable global defaults."""
+    template = configured_template._config["templates"]["test-template"]
+    template["description"] = "[draft] template"
+    template["defaults"]["author"] = "Template Author"
+    configured_template._config["global_defaults"] = {
+        "author": "Global Author",  # Overridden by the template default, so hidden
+        "license": "[bold]MIT[/bold]",
+    }
+    configured_template._save_config()
+
+    result = runner.invoke(cli, ["list", "--show-defaults"])
     assert result.exit_code == 0
-    
-    # Verify project was created
-    assert (output_dir / "My Project").exists()
-    assert (output_dir / "My Project" / "README.md").exists()
-
-def test_create_project_invalid_template(temp_config, tmp_path):
-    """Test creating a project with non-existent template."""
-    result = runner.invoke(app, [
-        "create",
-        "nonexistent-template",
-        "--output-dir", str(tmp_path)
-    ])
-    assert result.exit_code == 1
-    assert "Template 'nonexistent-template' not found" in result.stdout
+    assert "Template: test-template" in result.stdout
+    assert "Template Defaults:" in result.stdout
+    assert "author = Template Author" in result.stdout
+    assert "Applicable Global Defaults:" in result.stdout
+    assert "Global Author" not in result.stdout
+    # Config values are shown literally, not interpreted as Rich markup
+    assert "Description: [draft] template" in result.stdout
+    assert "license = [bold]MIT[/bold]" in result.stdout
+
+@pytest.mark.parametrize("extra_args,existing_output,expected,unexpected", [
+    # Template default wins for author, global default supplies license
+    ([], False, ["Template Author", "MIT"], ["John Doe"]),
+    # --no-defaults falls back to the cookiecutter.json values
+    (["--no-defaults"], False, ["John Doe"], ["Template Author"]),
+    # Existing output directory content is preserved
+    ([], True, ["Template Author"], []),
+    # Command line overrides take precedence over template and global defaults
+    (["--author", "Command Line Author", "--license", "GPL"], False,
+     ["Command Line Author", "GPL"], ["Template Author", "MIT"]),
+], ids=["defaults", "no-defaults", "existing-output-dir", "command-line-overrides"])
+def test_create_project(runner, cli, configured_template, tmp_path, extra_args, existing_output, expected, unexpected):
+    """Test creating a project from template."""
+    # Set template-specific and global defaults
+    configured_template._config["templates"]["test-template"]["defaults"]["author"] = "Template Author"
+    configured_template._config["global_defaults"]["license"] = "MIT"
+    configured_template._save_config()
 
-def test_create_project_invalid_template_path(temp_config, temp_template, tmp_path):
-    """Test creating a project with invalid template path."""
-    # Add template with invalid path
-    result = runner.invoke(app, [
-        "config", "add-template",
-        "--name", "test-template",
-        "--path", str(temp_template / "nonexistent")
-    ])
-    assert result.exit_code == 1
-    assert "Error: Template path does not exist" in result.stdout
+    output_dir = tmp_path / "output"
+    if existing_output:
+        output_dir.mkdir()
+        (output_dir / "existing.txt").write_text("existing content")
 
-def test_create_project_with_defaults(temp_config, temp_template, tmp_path):
-    """Test creating a project with template and global defaults."""
-    # Add template with defaults
-    runner.invoke(app, [
-        "config", "add-template",
-        "--name", "test-template",
-        "--path", str(temp_template)
-    ])
-    
-    # Set template-specific default
-    runner.invoke(app, [
-        "config", "set-default",
-        "--name", "test-template",
-        "--key", "author",
-        "--value", "Template Author"
-    ])
-    
-    # Set global default
-    runner.invoke(app, [
-        "config", "set-global-default",
-        "--key", "license",
-        "--value", "MIT"
-    ])
-    
     # Create project
-    output_dir = tmp_path / "output"
-    result = runner.invoke(app, [
+    result = runner.invoke(cli, [
         "create",
         "test-template",
-        "--output-dir", str(output_dir)
-    ])
+        "--output-dir", str(output_dir),
+        *extra_args
+    ], input=ACCEPT_DEFAULTS)
     assert result.exit_code == 0
-    
-    # Verify defaults were used
+
+    # Verify project was created with the expected values
     readme_path = output_dir / "My Project" / "README.md"
     assert readme_path.exists()
     content = readme_path.read_text()
-    assert "Template Author" in content  # Template default was used
-
-def test_create_project_no_defaults(temp_config, temp_template, tmp_path):
-    """Test creating a project without using defaults."""
-    # Add template
-    runner.invoke(app, [
-        "config", "add-template",
-        "--name", "test-template",
-        "--path", str(temp_template)
-    ])
-    
-    # Set some defaults that should be ignored
-    runner.invoke(app, [
-        "config", "set-default",
-        "--name", "test-template",
-        "--key", "author",
-        "--value", "Template Author"
-    ])
-    
-    # Create project with --no-defaults
+    for text in expected:
+        assert text in content
+    for text in unexpected:
+        assert text not in content
+    if existing_output:
+        assert (output_dir / "existing.txt").exists()
+
+def test_create_project_all_values_supplied(runner, cli, configured_template, tmp_path):
+    """Test that no prompt header is shown when every value is already supplied."""
     output_dir = tmp_path / "output"
-    result = runner.invoke(app, [
+    result = runner.invoke(cli, [
         "create",
         "test-template",
         "--output-dir", str(output_dir),
-        "--no-defaults"
+        "--project_name", "My Project",
+        "--author", "Command Line Author",
+        "--email", "cli@example.com",
+        "--license", "GPL"
     ])
     assert result.exit_code == 0
-    
-    # Verify cookiecutter defaults were used instead of config defaults
-    readme_path = output_dir / "My Project" / "README.md"
-    assert readme_path.exists()
-    content = readme_path.read_text()
-    assert "John Doe" in content  # Default from cookiecutter.json was used
+    assert "Please provide values" not in result.stdout
+    assert (output_dir / "My Project" / "README.md").exists()
 
-def test_create_project_existing_output_dir(temp_config, temp_template, tmp_path):
-    """Test creating a project in an existing output directory."""
-    # Add template
-    runner.invoke(app, [
-        "config", "add-template",
-        "--name", "test-template",
-        "--path", str(temp_template)
-    ])
-    
-    # Create output directory with some content
-    output_dir = tmp_path / "output"
-    output_dir.mkdir()
-    (output_dir / "existing.txt").write_text("existing content")
-    
-    # Create project
-    result = runner.invoke(app, [
+def test_create_project_invalid_template(runner, cli, temp_config, tmp_path):
+    """Test creating a project with non-existent template."""
+    result = runner.invoke(cli, [
         "create",
-        "test-template",
-        "--output-dir", str(output_dir)
+        "nonexistent-template",
+        "--output-dir", str(tmp_path)
     ])
-    assert result.exit_code == 0
-    
-    # Verify both the new project and existing content exist
-    assert (output_dir / "existing.txt").exists()
-    assert (output_dir / "My Project").exists()
-    assert (output_dir / "My Project" / "README.md").exists()
+    assert result.exit_code == 1
+    assert "Template 'nonexistent-template' not found" in result.stdout
 
-def test_create_project_with_command_line_overrides(temp_config, temp_template, tmp_path):
-    """Test creating a project with command line overrides that take precedence over defaults."""
-    # Add template with defaults
-    runner.invoke(app, [
+def test_create_project_invalid_template_path(runner, cli, temp_config, temp_template, tmp_path):
+    """Test creating a project with invalid template path."""
+    # Add template with invalid path
+    result = runner.invoke(cli, [
         "config", "add-template",
         "--name", "test-template",
-        "--path", str(temp_template)
-    ])
-    
-    # Set template-specific default
-    runner.invoke(app, [
-        "config", "set-default",
-        "--name", "test-template",
-        "--key", "author",
-        "--value", "Template Author"
-    ])
-    
-    # Set global default
-    runner.invoke(app, [
-        "config", "set-global-default",
-        "--key", "license",
-        "--value", "MIT"
-    ])
-    
-    # Create project with command line overrides
-    output_dir = tmp_path / "output"
-    result = runner.invoke(app, [
-        "create",
-        "test-template",
-        "--output-dir", str(output_dir),
-        "--author", "Command Line Author",  # This should override template default
-        "--license", "GPL"  # This should override global default
+        "--path", str(temp_template / "nonexistent"),
+        "--description", "Test template"
     ])
-    assert result.exit_code == 0
-    
-    # Verify overrides were used instead of defaults
-    readme_path = output_dir / "My Project" / "README.md"
-    assert readme_path.exists()
-    content = readme_path.read_text()
-    assert "Command Line Author" in content  # Command line override was used
-    assert "Template Author" not in content  # Template default was not used
-    assert "GPL" in content  # Command line override was used
-    assert "MIT" not in content  # Global default was not used
+    assert result.exit_code == 1
+    assert "Error" in result.stdout
+    assert "Template path does not exist" in result.stdout
 
-def test_help_text():
+def test_help_text(runner, cli):
     """Test help text formatting."""
-    result = runner.invoke(app, ["--help"])
+    result = runner.invoke(cli, ["--help"])
     assert result.exit_code == 0
     assert "Usage:" in result.stdout
     assert "Commands:" in result.stdout
 
-def test_config_help():
+def test_config_help(runner, cli):
     """Test config command help text."""
-    result = runner.invoke(app, ["config", "--help"])
+    result = runner.invoke(cli, ["config", "--help"])
     assert result.exit_code == 0
     assert "Usage:" in result.stdout
     assert "ACTION" in result.stdout  # The command expects an ACTION argument
 
-def test_remove_nonexistent_template(temp_config):
-    """Test removing a template that doesn't exist."""
-    result = runner.invoke(app, [
-        "config", "remove-template",
-        "--name", "nonexistent"
-    ])
+@pytest.mark.parametrize("action,exit_code,expected_msg", [
+    ("config-path", 0, "Configuration file location"),
+    ("bogus", 1, "Invalid action: bogus"),
+], ids=["config-path", "invalid-action"])
+def test_config_action_dispatch(runner, cli, temp_config, action, exit_code, expected_msg):
+    """Test dispatching config actions, including unknown ones."""
+    result = runner.invoke(cli, ["config", action])
+    assert result.exit_code == exit_code
+    assert expected_msg in result.stdout
+
+@pytest.mark.parametrize("args,expected_msg", [
+    (["remove-template", "--name", "nonexistent"], "Template 'nonexistent' not found"),
+    (["remove-default", "--name", "test-template", "--key", "nonexistent"], "Default 'nonexistent' not found"),
+    (["remove-global-default", "--key", "nonexistent"], "Global default 'nonexistent' not found"),
+], ids=["template", "default", "global-default"])
+def test_remove_nonexistent(runner, cli, configured_template, args, expected_msg):
+    """Test removing a template or default that doesn't exist."""
+    result = runner.invoke(cli, ["config", *args])
     assert result.exit_code == 1
-    assert "Template 'nonexistent' not found" in result.stdout
+    assert expected_msg in result.stdout
 
-def test_remove_nonexistent_default(temp_config, temp_template):
-    """Test removing a default that doesn't exist."""
-    # Add template
-    runner.invoke(app, [
-        "config", "add-template",
-        "--name", "test-template",
-        "--path", str(temp_template)
-    ])
-    
-    result = runner.invoke(app, [
-        "config", "remove-default",
-        "--name", "test-template",
-        "--key", "nonexistent"
-    ])
-    assert result.exit_code == 1
-    assert "Default 'nonexistent' not found" in result.stdout
+def test_remove_global_default_interactive(runner, cli, configured_template):
+    """Test that the interactive global-default removal lists the choices before prompting."""
+    configured_template._config["global_defaults"] = {"license": "[bold]MIT[/bold]", "year": "2025"}
+    configured_template._save_config()
 
-def test_remove_nonexistent_global_default(temp_config):
-    """Test removing a global default that doesn't exist."""
-    result = runner.invoke(app, [
-        "config", "remove-global-default",
-        "--key", "nonexistent"
-    ])
-    assert result.exit_code == 1
-    assert "Global default 'nonexistent' not found" in result.stdout
+    result = runner.invoke(cli, ["config", "remove-global-default"], input="year\ny\n")
+    assert result.exit_code == 0
+    assert "Available global defaults:\n  - license = [bold]MIT[/bold]\n  - year = 2025" in result.stdout
+    assert "Removed global default: year" in result.stdout
 
-def test_set_invalid_default(temp_config, temp_template):
+def test_set_invalid_default(runner, cli, configured_template):
     """Test setting a default for a key that doesn't exist in cookiecutter.json."""
-    # Add template
-    runner.invoke(app, [
-        "config", "add-template",
-        "--name", "test-template",
-        "--path", str(temp_template)
-    ])
-    
-    result = runner.invoke(app, [
+    result = runner.invoke(cli, [
         "config", "set-default",
         "--name", "test-template",
         "--key", "invalid_key",
@@ -366,11 +259,11 @@ def test_set_invalid_default(temp_config, temp_template):
     assert result.exit_code == 1
     assert "Key 'invalid_key' not found in cookiecutter.json" in result.stdout
 
-def test_config_add_template_interactive(temp_config, temp_template):
+def test_config_add_template_interactive(runner, cli, temp_config, temp_template):
     """Test adding a template in interactive mode."""
     # Simulate interactive input for name, path, and description
     result = runner.invoke(
-        app,
+        cli,
         ["config", "add-template"],
         input=f"test-template\n{temp_template}\nTest Description\n"
     )
@@ -379,14 +272,14 @@ def test_config_add_template_interactive(temp_config, temp_template):
     assert "Description: Test Description" in result.stdout
 
     # Verify template was added with correct values
-    result = runner.invoke(app, ["list"])
+    result = runner.invoke(cli, ["list"])
     assert "test-template" in result.stdout
     assert "Test Description" in result.stdout
 
-def test_config_add_template_interactive_partial(temp_config, temp_template):
+def test_config_add_template_interactive_partial(runner, cli, temp_config, temp_template):
     """Test adding a template with some values provided via CLI and others via interactive input."""
     result = runner.invoke(
-        app,
+        cli,
         ["config", "add-template", "--name", "test-template"],
         input=f"{temp_template}\nTest Description\n"
     )
@@ -395,11 +288,11 @@ def test_config_add_template_interactive_partial(temp_config, temp_template):
     assert "Description: Test Description" in result.stdout
 
     # Verify template was added with correct values
-    result = runner.invoke(app, ["list"])
+    result = runner.invoke(cli, ["list"])
     assert "test-template" in result.stdout
     assert "Test Description" in result.stdout
 
-def test_config_add_template_relative_path(temp_config, temp_template, monkeypatch):
+def test_config_add_template_relative_path(runner, cli, temp_config, temp_template, monkeypatch):
     """Test adding a template using a relative path."""
     # Set up a fake current working directory
     fake_cwd = temp_template.parent
@@ -408,7 +301,7 @@ def test_config_add_template_relative_path(temp_config, temp_template, monkeypat
     # Use relative path (just the template directory name)
     relative_path = temp_template.name
 
-    result = runner.invoke(app, [
+    result = runner.invoke(cli, [
         "config", "add-template",
         "--name", "test-template",
         "--path", relative_path,
@@ -418,12 +311,13 @@ def test_config_add_template_relative_path(temp_config, temp_template, monkeypat
     assert "Added template" in result.stdout
 
     # Verify template was added with absolute path
-    result = runner.invoke(app, ["config", "show"])
+    result = runner.invoke(cli, ["config", "show"])
     config_output = result.stdout
     assert str(temp_template.resolve()) in config_output  # Should show absolute path
     assert "test-template" in config_output
+    assert Config()._config["templates"]["test-template"]["path"] == str(temp_template.resolve())
 
-def test_config_add_template_relative_path_interactive(temp_config, temp_template, monkeypatch):
+def test_config_add_template_relative_path_interactive(runner, cli, temp_config, temp_template, monkeypatch):
     """Test adding a template using a relative path in interactive mode."""
     # Set up a fake current working directory
     fake_cwd = temp_template.parent
@@ -432,7 +326,7 @@ def test_config_add_template_relative_path_interactive(temp_config, temp_templat
     # Use relative path in interactive input
     relative_path = temp_template.name
     result = runner.invoke(
-        app,
+        cli,
         ["config", "add-template"],
         input=f"test-template\n{relative_path}\nTest Description\n"
     )
@@ -440,7 +334,48 @@ def test_config_add_template_relative_path_interactive(temp_config, temp_templat
     assert "Added template" in result.stdout
 
     # Verify template was added with absolute path
-    result = runner.invoke(app, ["config", "show"])
+    result = runner.invoke(cli, ["config", "show"])
     config_output = result.stdout
     assert str(temp_template.resolve()) in config_output  # Should show absolute path
     assert "test-template" in config_output
+    assert Config()._config["templates"]["test-template"]["path"] == str(temp_template.resolve())
+
+def test_load_cookiecutter_config_reloads_on_change(temp_template):
+    """Test that the cached cookiecutter.json is re-read once the file changes."""
+    from wanpc.cli import load_cookiecutter_config
+
+    assert "author" in load_cookiecutter_config(str(temp_template))
+
+    cookiecutter_json = temp_template / "cookiecutter.json"
+    stat = cookiecutter_json.stat()
+    cookiecutter_json.write_text('{"project_name": "Other"}')
+    os.utime(cookiecutter_json, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert load_cookiecutter_config(str(temp_template)) == {"project_name": "Other"}
+
+def test_replace_placeholders():
+    """Test single-pass substitution of cookiecutter placeholders in docs templates."""
+    from wanpc.cli import _replace_placeholders
+
+    mapping = {"project_slug": "pkg", "year": "2025", "project_slug.upper()": "PKG"}
+    text = "{{ cookiecutter.project_slug }} {{cookiecutter.year}} {{ cookiecutter.project_slug.upper() }} {{ cookiecutter.other }}"
+    assert _replace_placeholders(text, mapping) == "pkg 2025 PKG {{ cookiecutter.other }}"
+
+def test_rewrite_placeholders_in_docs_template(tmp_path):
+    """Test that any text file in the docs template is rewritten and binary files are left alone."""
+    from wanpc.cli import _iter_template_files, _rewrite_placeholders
+
+    (tmp_path / "_templates").mkdir()
+    (tmp_path / "index.markdown").write_text("# {{ cookiecutter.project_name }}\n")
+    (tmp_path / "_templates" / "module.rst_t").write_text("{{ cookiecutter.project_slug }}\n")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG{{ cookiecutter.project_name }}")
+    (tmp_path / "data.bin").write_bytes(b"\xff\xfe{{ cookiecutter.project_name }}")
+
+    files = _iter_template_files(tmp_path)
+    assert tmp_path / "logo.png" not in files
+    for path in files:
+        _rewrite_placeholders(path, {"project_name": "pkg", "project_slug": "pkg"})
+
+    assert (tmp_path / "index.markdown").read_text() == "# pkg\n"
+    assert (tmp_path / "_templates" / "module.rst_t").read_text() == "pkg\n"
+    assert (tmp_path / "data.bin").read_bytes() == b"\xff\xfe{{ cookiecutter.project_name }}"
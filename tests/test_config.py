@@ -1,9 +1,10 @@
 """Tests for configuration management."""
 
 import json
+import os
 from pathlib import Path
 import pytest
-from wanpc.config import Config
+from wanpc.config import Config, config_transaction, load_config, save_config, shared_config
 from wanpc.exceptions import PackageCreationError
 
 def test_config_initialization(temp_home):
@@ -19,28 +20,6 @@ def test_config_load_nonexistent(temp_home):
     config.load()
     assert config._config == {}
 
-def test_config_save_and_load(temp_config):
-    """Test saving and loading config."""
-    config = Config()
-    test_data = {
-        "templates": {
-            "test-template": {
-                "path": "/path/to/template",
-                "description": "Test template",
-                "defaults": {"author": "Test Author"}
-            }
-        },
-        "global_defaults": {
-            "license": "MIT"
-        }
-    }
-    config._config = test_data
-    config._save_config()
-    
-    # Load in a new instance
-    new_config = Config()
-    assert new_config._config == test_data
-
 def test_config_save_and_load(temp_config):
     """Test saving and loading configuration."""
     config = Config()
@@ -48,6 +27,7 @@ def test_config_save_and_load(temp_config):
         "templates": {
             "test": {
                 "path": "/test/path",
+                "description": "Test template",
                 "defaults": {"author": "Test Author"}
             }
         },
@@ -61,15 +41,125 @@ def test_config_save_and_load(temp_config):
     new_config = Config()
     assert new_config._config == config._config
 
+def test_config_load_picks_up_external_changes(temp_config):
+    """Test that load() always reflects the file on disk."""
+    config = Config()
+    config._config = {"templates": {}, "global_defaults": {"license": "MIT"}}
+    config._save_config()
+
+    # Unchanged file: unsaved in-memory edits are discarded
+    config._config["global_defaults"]["author"] = "Unsaved Author"
+    config.load()
+    assert config._config == {"templates": {}, "global_defaults": {"license": "MIT"}}
+
+    # File rewritten by someone else: load() picks up the new contents
+    other = Config()
+    other._config = {"templates": {}, "global_defaults": {"license": "GPL"}}
+    other._save_config()
+    config.load()
+    assert config._config == {"templates": {}, "global_defaults": {"license": "GPL"}}
+
+def test_config_skip_load(temp_config):
+    """Test that Config(load=False) does not read the file it is about to overwrite."""
+    (temp_config / "config.toml").write_text("invalid [ toml")
+
+    config = Config(load=False)
+    assert config._config == {}
+    config._config = {"templates": {}, "global_defaults": {"license": "MIT"}}
+    config._save_config()
+    assert Config()._config == config._config
+
+def test_shared_config(temp_config, tmp_path, monkeypatch):
+    """Test that the free functions share one Config per home directory."""
+    cfg = load_config()
+    cfg["global_defaults"]["license"] = "MIT"
+    save_config(cfg)
+    assert shared_config() is shared_config()
+    assert load_config()["global_defaults"] == {"license": "MIT"}
+
+    # Unsaved edits to a loaded copy are not seen by later loads
+    load_config()["global_defaults"]["license"] = "GPL"
+    assert load_config()["global_defaults"] == {"license": "MIT"}
+    assert shared_config()._config["global_defaults"] == {"license": "MIT"}
+
+    # Deleting the file empties the shared config, and a later save doesn't resurrect it
+    os.remove(temp_config / "config.toml")
+    assert load_config() == {"templates": {}, "global_defaults": {}}
+    save_config({"global_defaults": {"year": "2025"}})
+    assert Config()._config["global_defaults"] == {"year": "2025"}
+
+    # A different home directory gets its own instance, and nothing is written until a save
+    monkeypatch.setenv("HOME", str(tmp_path / "other"))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path / "other"))
+    assert load_config() == {"templates": {}, "global_defaults": {}}
+    assert not (tmp_path / "other" / ".wanpc" / "config.toml").exists()
+
+def test_config_transaction(temp_config):
+    """Test that a transaction writes once on change and never on error."""
+    config_file = temp_config / "config.toml"
+
+    with config_transaction() as cfg:
+        cfg.setdefault("global_defaults", {})["license"] = "MIT"
+        assert not config_file.exists()  # Nothing written until the block ends
+    assert Config()._config == {"global_defaults": {"license": "MIT"}}
+
+    mtime = config_file.stat().st_mtime_ns
+    with config_transaction() as cfg:
+        pass
+    assert config_file.stat().st_mtime_ns == mtime
+
+    # Reloading the shared instance mid-block does not drop the block's edits
+    with config_transaction() as cfg:
+        cfg["global_defaults"]["year"] = "2025"
+        shared_config()
+    assert Config()._config == {"global_defaults": {"license": "MIT", "year": "2025"}}
+    with config_transaction() as cfg:
+        del cfg["global_defaults"]["year"]
+
+    with pytest.raises(RuntimeError):
+        with config_transaction() as cfg:
+            cfg["global_defaults"]["license"] = "GPL"
+            raise RuntimeError("boom")
+    assert Config()._config == {"global_defaults": {"license": "MIT"}}
+    assert load_config()["global_defaults"] == {"license": "MIT"}
+
+def test_config_load_detects_replaced_file(temp_config, tmp_path):
+    """Test that a file swapped in with the same size and mtime is still re-read."""
+    config_file = temp_config / "config.toml"
+    config_file.write_text('[global_defaults]\nlicense = "MIT"\n')
+    mtime_ns = config_file.stat().st_mtime_ns
+    config = Config()
+
+    replacement = temp_config / "replacement.toml"
+    replacement.write_text('[global_defaults]\nlicense = "GPL"\n')
+    os.utime(replacement, ns=(mtime_ns, mtime_ns))
+    os.replace(replacement, config_file)
+
+    config.load()
+    assert config._config == {"global_defaults": {"license": "GPL"}}
+
 def test_config_invalid_toml(temp_config):
     """Test loading invalid TOML config."""
     # Write invalid TOML
-    with open(temp_config / "config.toml", "w") as f:
-        f.write("invalid [ toml")
-    
+    (temp_config / "config.toml").write_text("invalid [ toml")
+
+    # Config() parses the file on construction, so no explicit load() is needed
     with pytest.raises(PackageCreationError):
-        config = Config()
-        config.load()
+        Config()
+
+def test_get_git_config(temp_home, tmp_path, monkeypatch):
+    """Test reading the git user name and email."""
+    gitconfig = tmp_path / "gitconfig"
+    gitconfig.write_text("[user]\n\tname = Git User\n\temail = git@example.com\n")
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(gitconfig))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    monkeypatch.chdir(tmp_path)
+
+    config = Config()
+    assert config.get_git_config() == ("Git User", "git@example.com")
+
+    gitconfig.write_text("")
+    assert config.get_git_config() == (None, None)
 
 def test_get_merged_defaults():
     """Test merging of template and global defaults."""
@@ -150,6 +240,16 @@ def test_config_invalid_template_path(temp_config):
     assert "test" in new_config._config["templates"]
     assert new_config._config["templates"]["test"]["path"] == "/nonexistent/path"
 
+def test_config_template_path(temp_config, tmp_path):
+    """Test that template paths are resolved and follow edits to the raw path."""
+    config = Config()
+    config._config = {"templates": {"test": {"path": str(tmp_path / "a" / ".." / "b")}}}
+    assert config.template_path("test") == (tmp_path / "b").resolve()
+    assert config.template_path("missing") is None
+
+    config._config["templates"]["test"]["path"] = str(tmp_path / "c")
+    assert config.template_path("test") == (tmp_path / "c").resolve()
+
 def test_get_merged_defaults_no_template():
     """Test merging defaults when template doesn't exist."""
     config_data = {
@@ -161,6 +261,17 @@ def test_get_merged_defaults_no_template():
     with pytest.raises(KeyError):
         Config.get_merged_defaults(config_data, "nonexistent")
 
+def test_get_merged_defaults_free_function():
+    """Test that the module-level helper falls back to global defaults for unknown templates."""
+    from wanpc.config import get_merged_defaults
+
+    config_data = {
+        "templates": {"test": {"defaults": {"author": "Template Author"}}},
+        "global_defaults": {"author": "Global Author", "license": "MIT"}
+    }
+    assert get_merged_defaults(config_data, "test") == {"author": "Template Author", "license": "MIT"}
+    assert get_merged_defaults(config_data, "nonexistent") == {"author": "Global Author", "license": "MIT"}
+
 def test_config_missing_file(temp_config):
     """Test loading config when file doesn't exist."""
     # Remove config file if it exists
@@ -23,9 +23,9 @@ def test_setup_logging(tmp_path):
     # Test log message
     test_message = "Test log message"
     logger.info(test_message)
-    assert log_file.exists()
-    log_content = log_file.read_text()
-    assert test_message in log_content
+    for handler in logger.handlers:
+        handler.flush()
+    assert test_message.encode() in log_file.read_bytes()
 
 def test_setup_logging_invalid_level():
     """Test setup_logging with invalid level."""
@@ -40,3 +40,12 @@ def test_setup_logging_invalid_file(tmp_path):
     logger = setup_logging(log_file=invalid_path)
     assert len(logger.handlers) > 0
     assert all(isinstance(h, logging.StreamHandler) for h in logger.handlers)
+
+def test_setup_logging_idempotent(tmp_path):
+    """Test that repeating the same setup keeps the installed handlers."""
+    log_file = tmp_path / "test.log"
+    logger = setup_logging(log_file=log_file)
+    handlers = list(logger.handlers)
+
+    assert setup_logging(log_file=log_file).handlers == handlers
+    assert setup_logging(level=logging.DEBUG, log_file=log_file).handlers != handlers
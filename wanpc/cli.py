@@ -1,57 +1,111 @@
 """Command line interface for wanpc."""
 import json
+import logging
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterable, List
 import typer
 from rich.console import Console
-from rich.table import Table
 from rich.text import Text
-from cookiecutter.main import cookiecutter
-import tomli, tomli_w
-from rich.prompt import Prompt, Confirm
-import shutil
-from validate_pyproject import api, errors
-import subprocess
 import re
-import webbrowser, threading, time
 
-from .config import Config
+from .config import Config, config_transaction, shared_config
+from .exceptions import PackageCreationError
 from . import logger
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Rich style tags such as [bold], [/cyan] or [bold cyan]
+_MARKUP_RE = re.compile(r"\[/?[a-z ]*\]")
+
+@lru_cache(maxsize=None)
 def format_help(text: str) -> str:
     """Format help text with proper word wrapping."""
-    return str(Text.from_markup(text).plain)
+    return _MARKUP_RE.sub("", text)
 
-def get_config() -> Dict[str, Any]:
-    """Load and return the configuration."""
-    cfg = Config()
-    return cfg._config
+def _get_config() -> Config:
+    """Return the shared Config, freshly loaded from disk."""
+    return shared_config()
 
-def save_config(cfg: Dict[str, Any]) -> None:
-    """Save configuration."""
-    config = Config()
-    config._config = cfg
-    config._save_config()
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
 
 def is_valid_email(email: str) -> bool:
     """Validate an email address using a regular expression."""
-    email_regex = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-    return re.match(email_regex, email) is not None
+    return _EMAIL_RE.match(email) is not None
+
+@lru_cache(maxsize=32)
+def _read_cookiecutter_json(config_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse cookiecutter.json, cached per path and modification time."""
+    # Both parsers take bytes and decode UTF-8 themselves
+    return _json_loads(Path(config_path).read_bytes())
+
+# Matches {{ cookiecutter.<key> }} placeholders, including expressions like project_slug.upper()
+_PLACEHOLDER_RE = re.compile(r'\{\{\s*cookiecutter\.([A-Za-z_().]+?)\s*\}\}')
+
+# Project name placeholders in the template's .gitlab-ci.yml
+_CI_PROJECT_RE = re.compile(r'\$PROJECT_NAME|\{\{\s*cookiecutter\.project_slug\s*\}\}')
+
+# Binary assets in the docs template that are copied untouched without being read;
+# any other file is rewritten if it decodes as UTF-8
+_BINARY_SUFFIXES = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".ico", ".bmp", ".webp", ".pdf",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot", ".zip", ".gz", ".pyc",
+})
+
+# Directories in the docs template that never need placeholder substitution
+_SKIP_DIRS = frozenset({"_build", "__pycache__", ".git"})
+
+def _iter_template_files(root: Path) -> List[Path]:
+    """List possibly placeholder-bearing files under root, pruning build and VCS directories."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in _SKIP_DIRS]
+        files.extend(
+            Path(dirpath, name) for name in filenames
+            if Path(name).suffix.lower() not in _BINARY_SUFFIXES
+        )
+    return files
+
+def _replace_placeholders(text: str, mapping: Dict[str, str]) -> str:
+    """Substitute known cookiecutter placeholders in a single pass, leaving unknown ones as-is."""
+    return _PLACEHOLDER_RE.sub(lambda m: mapping.get(m.group(1), m.group(0)), text)
+
+def _rewrite_placeholders(file_path: Path, mapping: Dict[str, str]) -> None:
+    """Substitute placeholders in a file, only writing it back if something changed."""
+    try:
+        content = file_path.read_text(encoding="utf-8")
+    except UnicodeDecodeError:
+        # Not text, so there is nothing to substitute
+        return
+    new_content = _replace_placeholders(content, mapping)
+    if new_content != content:
+        file_path.write_text(new_content, encoding="utf-8")
 
 def load_cookiecutter_config(template_path: str) -> Dict[str, Any]:
     """Load cookiecutter.json from template directory."""
     try:
-        config_path = Path(template_path).expanduser().resolve() / "cookiecutter.json"
-        if not config_path.exists():
+        # Callers pass absolute template paths, so only "~" needs expanding here
+        config_path = Path(template_path).expanduser() / "cookiecutter.json"
+        try:
+            # One stat both checks existence and keys the cache
+            mtime_ns = config_path.stat().st_mtime_ns
+        except FileNotFoundError:
             raise typer.BadParameter(f"No cookiecutter.json found in {template_path}")
         
-        with open(config_path) as f:
-            return json.load(f)
+        # Hand out a copy so callers can't mutate the cached parse
+        return dict(_read_cookiecutter_json(str(config_path), mtime_ns))
     except Exception as e:
         raise typer.BadParameter(f"Failed to load cookiecutter.json: {str(e)}")
 
 def prompt_for_defaults(template_path: str, existing_defaults: Dict[str, Any] = None) -> Dict[str, Any]:
     """Prompt user for default values based on cookiecutter.json."""
+    from rich.prompt import Prompt
+
     cookiecutter_config = load_cookiecutter_config(template_path)
     defaults = {}
     existing_defaults = existing_defaults or {}
@@ -96,29 +150,45 @@ For detailed help on any command, use:\n
 )
 console = Console()
 
-def display_template_info(template_name: str, template_data: Dict[str, Any], cfg: Dict[str, Any]) -> None:
-    """Display detailed information about a template."""
-    console.print(f"\n[bold cyan]Template:[/bold cyan] {template_name}")
+def _print_choices(title: str, items: Iterable[str]) -> None:
+    """Print a titled bullet list in one render, showing the items literally."""
+    text = Text()
+    text.append(f"\n{title}:", style="bold")
+    for item in items:
+        text.append(f"\n  - {item}")
+    console.print(text)
+
+def display_template_info(template_name: str, template_data: Dict[str, Any], global_defaults: Dict[str, Any]) -> None:
+    """Display detailed information about a template, given the global defaults shared by all templates."""
+    text = Text()
+    text.append("\nTemplate:", style="bold cyan")
+    text.append(f" {template_name}\n")
     
     if "description" in template_data:
-        console.print(f"[bold]Description:[/bold] {template_data['description']}")
+        text.append("Description:", style="bold")
+        text.append(f" {template_data['description']}\n")
     
-    console.print(f"[bold]Path:[/bold] {template_data['path']}")
+    text.append("Path:", style="bold")
+    text.append(f" {template_data['path']}")
     
     # Show template-specific defaults
     defaults = template_data.get("defaults", {})
     if defaults:
-        console.print("\n[bold]Template Defaults:[/bold]")
+        text.append("\n\nTemplate Defaults:", style="bold")
         for key, value in defaults.items():
-            console.print(f"  [cyan]{key}[/cyan] = {value}")
+            text.append("\n  ")
+            text.append(key, style="cyan")
+            text.append(f" = {value}")
     
     # Show applicable global defaults
-    global_defaults = cfg.get("global_defaults", {})
     if global_defaults:
-        console.print("\n[bold]Applicable Global Defaults:[/bold]")
+        text.append("\n\nApplicable Global Defaults:", style="bold")
         for key, value in global_defaults.items():
             if key not in defaults:  # Only show if not overridden by template default
-                console.print(f"  [cyan]{key}[/cyan] = {value}")
+                text.append("\n  ")
+                text.append(key, style="cyan")
+                text.append(f" = {value}")
+    console.print(text)
 
 
 #todo fix alias
@@ -136,13 +206,15 @@ def my_list_command(
     \nExamples:\n
     \t$ wanpc list\n
     \t$ wanpc list --show-defaults"""
+    from rich.table import Table
+
     table = Table(title="Available Templates")
     table.add_column("Name", style="cyan")
     table.add_column("Description", style="yellow")
     table.add_column("Path", style="green")
 
     try:
-        cfg = get_config()
+        cfg = _get_config()._config
         templates = cfg.get("templates", {})
         
         if not templates:
@@ -150,15 +222,16 @@ def my_list_command(
             return
         
         if show_defaults:
+            global_defaults = cfg.get("global_defaults", {})
             for name, data in templates.items():
-                display_template_info(name, data, cfg)
+                display_template_info(name, data, global_defaults)
         else:
-            for name, data in templates.items():
-                table.add_row(
-                    name,
-                    data.get("description", "No description"),
-                    data.get("path", "Not set")
-                )
+            rows = [
+                (name, data.get("description", "No description"), data.get("path", "Not set"))
+                for name, data in templates.items()
+            ]
+            for row in rows:
+                table.add_row(*row)
             console.print(table)
 
     except Exception as e:
@@ -179,6 +252,8 @@ def run_docs(
     )
 ):
     """Run the documentation using Sphinx with auto-rebuild on changes."""
+    import subprocess
+
     try:
         if target_dir is None:
             target_dir = Path.cwd()
@@ -208,13 +283,6 @@ def run_docs(
             "--re-ignore", ".*/_build/.*",  # Ignore build directory
         ], check=True, cwd=target_dir)
 
-        # Open browser after a short delay
-        def open_browser():
-            time.sleep(2) 
-            webbrowser.open(f"http://localhost:{port}")
-            
-        threading.Thread(target=open_browser).start()
-
     except Exception as e:
         console.print(f"[red]Error serving documentation: {str(e)}[/red]")
         raise typer.Exit(1)   
@@ -232,6 +300,14 @@ def add_docs(
     )
 ):
     """Add a docs folder with initial documentation structure."""
+    import shutil
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor
+
+    import tomli
+    import tomli_w
+    from validate_pyproject import api, errors
+
     docs_made = False
     docs_path = ""
     try:
@@ -241,11 +317,13 @@ def add_docs(
             target_dir = Path(target_dir).expanduser().resolve()
 
         pyproject_path = target_dir / "pyproject.toml"
-        if not pyproject_path.exists():
+        try:
+            f = open(pyproject_path, "rb")
+        except FileNotFoundError:
             console.print(f"[red]Error: pyproject.toml not found in {target_dir}[/red]")
             raise typer.Exit(1)
 
-        with open(pyproject_path, "rb") as f:
+        with f:
             pyproject_data = tomli.load(f)
             project_data = pyproject_data.get("project", pyproject_data.get("tool", {}).get("poetry", {}))
             name = project_data.get("name")
@@ -271,47 +349,40 @@ def add_docs(
             raise typer.Exit(1)
 
         # Get the template path from the configuration
-        cfg = get_config()
+        config = _get_config()
+        cfg = config._config
         templates = cfg.get("templates", {})
         if not templates:
             console.print(f"[red]Error: No templates found in configuration[/red]")
             raise typer.Exit(1)
 
         # Use the path of the first template to find the docs template
-        first_template_path = Path(next(iter(templates.values()))["path"])
+        first_template_path = config.template_path(next(iter(templates)))
         template_path = first_template_path.parent / "docs" / "docs"
         
         if not template_path.exists():
             console.print(f"[red]Error: Docs template path does not exist: {template_path}[/red]")
             raise typer.Exit(1)
         
-        requirements_path = template_path.parent.parent / "requirements.txt"
-
         # Copy the template to the target directory
         shutil.copytree(template_path, docs_path)
         docs_made = True
 
         # Modify the copied files according to the package in question
         # For example, you can replace placeholders in the copied files
-        for file_path in docs_path.rglob('*'):
-            if file_path.is_file():
-                content = file_path.read_text()
-                content = content.replace('{{ cookiecutter.project_slug }}', (name))
-                content = content.replace('{{ cookiecutter.project_name }}', (name))
-                content = content.replace('{{ cookiecutter.author_name }}', (authors[0]["name"]))
-                content = content.replace('{{ cookiecutter.version }}', (release))
-                content = content.replace('{{ cookiecutter.release }}', (release))
-                content = content.replace('{{ cookiecutter.year }}', str(year))
-                content = content.replace('{{ cookiecutter.project_slug.upper() }}', name.upper())
-                file_path.write_text(content) 
-
-        # Add documentation dependencies to pyproject.toml
-        if not requirements_path.exists():
-            console.print(f"[red]Error: requirements.txt not found in {template_path}[/red]")
-            raise typer.Exit(1)
-
-        with open(requirements_path, "r") as req_file:
-            doc_dependencies = [line.strip() for line in req_file if line.strip() and not line.startswith("#") and not line.startswith('{')]
+        replacements = {
+            "project_slug": name,
+            "project_name": name,
+            "author_name": authors[0]["name"],
+            "version": release,
+            "release": release,
+            "year": str(year),
+            "project_slug.upper()": name.upper(),
+        }
+        files = _iter_template_files(docs_path)
+        # Each file is independent, so overlap the reads and writes
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda p: _rewrite_placeholders(p, replacements), files))
 
         # Add documentation dependencies to pyproject.toml
         doc_dependencies = {
@@ -327,7 +398,6 @@ def add_docs(
             "sphinx-design": ">=0.5.0",
             "sphinx-pydantic": ">=0.1.1",
             "myst-nb" : ">=0.13.1",
-            "nbsphinx" : ">=0.9.3",
         }
 
         if "tool" not in pyproject_data:
@@ -369,21 +439,24 @@ def add_docs(
             print(f"Invalid Document: {ex.message}")
 
         yml_path = first_template_path.parent / ".gitlab-ci.yml"
-        if yml_path.exists() and not (target_dir / ".gitlab-ci.yml").exists():
+        try:
             with open(yml_path, "r") as yml_file:
                 yml_content = yml_file.read()
-            yml_content = yml_content.replace("$PROJECT_NAME", name)
-            yml_content = yml_content.replace("{{ cookiecutter.project_slug }}", name)
-            with open(target_dir / ".gitlab-ci.yml", "w") as yml_file:
+            yml_content = _CI_PROJECT_RE.sub(lambda m: name, yml_content)
+            # "x" refuses to clobber a .gitlab-ci.yml the project already has
+            with open(target_dir / ".gitlab-ci.yml", "x") as yml_file:
                 yml_file.write(yml_content)
+        except (FileNotFoundError, FileExistsError):
+            # No CI template to copy, or the project keeps its own
+            pass
 
-        # Install documentation dependencies using poetry
+        # Install documentation dependencies using poetry. pyproject.toml was just
+        # rewritten, so refresh the lock first; one install then covers the docs group.
         console.print("[green]Installing documentation dependencies using Poetry...[/green]")
+        subprocess.run(["poetry", "lock"], check=True, cwd=target_dir)
         subprocess.run(["poetry", "install", "--with", "docs"], check=True, cwd=target_dir)
 
         # Build the HTML documentation using Sphinx
-        subprocess.run(["poetry","lock"], check=True, cwd=target_dir)
-        subprocess.run(["poetry", "install"], check=True, cwd=target_dir)
         console.print("[green]Building HTML documentation using Sphinx...[/green]")
         subprocess.run(["poetry", "run", "sphinx-apidoc", "-o", str(docs_path / "source"), name], check=True, cwd=target_dir)
         console.print(f"[green]HTML documentation built successfully in {docs_path / '_build' / 'html'}[/green]")
@@ -425,8 +498,12 @@ def create(
     \t$ wanpc create python-pkg --output-dir ~/projects/new-pkg\n
     \t$ wanpc create python-pkg --no-defaults\n
     \t$ wanpc create python-pkg --author "John Doe" --license MIT  # Override defaults"""
+    from cookiecutter.main import cookiecutter
+    from rich.prompt import Prompt
+
     try:
-        cfg = get_config()
+        config = _get_config()
+        cfg = config._config
         templates = cfg.setdefault("templates", {})
         
         if template not in templates:
@@ -434,14 +511,13 @@ def create(
             raise typer.Exit(1)
             
         template_data = templates[template]
-        template_path = template_data.get("path")
+        template_path = config.template_path(template)
         
         if not template_path:
             console.print(f"[red]Error: No path set for template '{template}'[/red]")
             raise typer.Exit(1)
         
         # Verify template path exists
-        template_path = Path(template_path).expanduser().resolve()
         if not template_path.exists():
             console.print(f"[red]Error: Template path does not exist: {template_path}[/red]")
             raise typer.Exit(1)
@@ -452,21 +528,27 @@ def create(
             console.print(f"[red]Error: No cookiecutter.json found in {template_path}[/red]")
             raise typer.Exit(1)
 
-        # Debug: Log cookiecutter config contents
-        logger.debug("Cookiecutter config contents:")
-        for key, value in cookiecutter_config.items():
-            logger.debug(f"  {key}: {value} (type: {type(value)})")
+        # Debug: Log cookiecutter config contents (skip the formatting unless it will be shown)
+        debug_enabled = logger.get_logger().isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("Cookiecutter config contents:")
+            for key, value in cookiecutter_config.items():
+                logger.debug(f"  {key}: {value} (type: {type(value)})")
 
-        # Parse any command line overrides
+        # Parse any command line overrides, collecting the report lines to print in one go
         extra_context = {}
-        for item in ctx.args:
+        lines: List[Text] = []
+        args = ctx.args
+        cc_keys = frozenset(cookiecutter_config)
+        it = iter(enumerate(args))
+        for i, item in it:
             if item.startswith("--"):
                 key = item[2:]  # Remove --
-                if key in cookiecutter_config and len(ctx.args) > ctx.args.index(item) + 1:
-                    value = ctx.args[ctx.args.index(item) + 1]
-                    if not value.startswith("--"):
-                        extra_context[key] = value
-                        console.print(f"[yellow]Using override for {key}: {value}[/yellow]")
+                if key in cc_keys and i + 1 < len(args) and not args[i + 1].startswith("--"):
+                    value = args[i + 1]
+                    extra_context[key] = value  # A repeated flag keeps its last value
+                    lines.append(Text(f"Using override for {key}: {value}", style="yellow"))
+                    next(it, None)  # Skip the consumed value
 
         # Add defaults if enabled (but don't override command line values)
         if not no_defaults:
@@ -479,43 +561,55 @@ def create(
                             extra_context[key] = value
                             if key in template_data.get("defaults", {}):
                                 if key in cfg.get("global_defaults", {}):
-                                    console.print(f"  {key}: {value} [yellow](template default, overriding global)[/yellow]")
+                                    tag = ("(template default, overriding global)", "yellow")
                                 else:
-                                    console.print(f"  {key}: {value} [yellow](template default)[/yellow]")
+                                    tag = ("(template default)", "yellow")
                             else:
-                                console.print(f"  {key}: {value} [blue](global default)[/blue]")
+                                tag = ("(global default)", "blue")
+                            lines.append(Text.assemble(f"  {key}: {value} ", tag))
             except KeyError:
                 console.print(f"[red]Error: Template '{template}' not found in config[/red]")
                 raise typer.Exit(1)
 
-        # Prompt for any missing values
-        console.print("\n[bold cyan]Please provide values for the following:[/bold cyan]")
+        if lines:
+            console.print(Text("\n").join(lines))
+
+        # Work out which values still need a prompt
+        missing = []
         for key, default_value in cookiecutter_config.items():
+            if key in extra_context or key.startswith('_'):  # Skip provided and internal keys
+                continue
+            # Skip derived values (those that are Jinja2 templates)
+            if isinstance(default_value, str) and '{{' in default_value:
+                if debug_enabled:
+                    logger.debug(f"Skipping template value: {key}")
+                continue
+            missing.append((key, default_value))
+
+        # Prompt for any missing values
+        if missing:
+            console.print("\n[bold cyan]Please provide values for the following:[/bold cyan]")
+        for key, default_value in missing:
             try:
-                logger.debug(f"Processing key: {key}, value: {default_value} (type: {type(default_value)})")
-                
-                if key not in extra_context and not key.startswith('_'):  # Skip internal keys
-                    # Skip derived values (those that are Jinja2 templates)
-                    if type(default_value) == str and default_value.find('{{') != -1:
-                        logger.debug(f"Skipping template value: {key}")
-                        continue
-                    
-                    # For list values, only show as choices, not as default
-                    if type(default_value) == list:
-                        choices = [str(choice) for choice in default_value]
-                        value = Prompt.ask(
-                            f"[cyan]{key}[/cyan] [dim](choices: {', '.join(choices)})[/dim]",
-                            choices=choices,
-                            default=choices[0]
-                        )
-                    else:
-                        # For non-list values, show default
-                        prompt = f"[cyan]{key}[/cyan]"
-                        if default_value:
-                            prompt += f" [dim](default: {default_value})[/dim]"
-                        value = Prompt.ask(prompt, default=str(default_value) if default_value else "")
-                        
-                    extra_context[key] = value
+                if debug_enabled:
+                    logger.debug(f"Processing key: {key}, value: {default_value} (type: {type(default_value)})")
+
+                # For list values, only show as choices, not as default
+                if isinstance(default_value, list):
+                    choices = [str(choice) for choice in default_value]
+                    value = Prompt.ask(
+                        f"[cyan]{key}[/cyan] [dim](choices: {', '.join(choices)})[/dim]",
+                        choices=choices,
+                        default=choices[0]
+                    )
+                else:
+                    # For non-list values, show default
+                    prompt = f"[cyan]{key}[/cyan]"
+                    if default_value:
+                        prompt += f" [dim](default: {default_value})[/dim]"
+                    value = Prompt.ask(prompt, default=str(default_value) if default_value else "")
+
+                extra_context[key] = value
             except Exception as e:
                 logger.error(f"Error processing {key}: {str(e)}")
                 raise
@@ -541,6 +635,220 @@ def create(
         console.print(f"[red]Error creating project: {str(e)}[/red]")
         raise typer.Exit(1)
 
+def _config_config_path(cfg: Dict[str, Any], **_: Any) -> None:
+    """Show where the configuration file lives and whether it exists."""
+    console.print("\n[bold]Configuration file location:[/bold]")
+    config_file = _get_config().config_file
+    console.print(f"[cyan]{config_file}[/cyan]")
+
+    if config_file.exists():
+        console.print("[green]Status: File exists[/green]")
+        size = config_file.stat().st_size
+        console.print(f"Size: {size} bytes")
+    else:
+        console.print("[yellow]Status: File does not exist yet[/yellow]")
+        console.print("A new configuration file will be created when needed")
+
+def _config_show(cfg: Dict[str, Any], **_: Any) -> None:
+    """Print the current configuration."""
+    if not cfg:
+        console.print("[yellow]No configuration found.[/yellow]")
+        return
+    console.print("\n[bold]Current Configuration:[/bold]")
+    console.print(json.dumps(cfg, indent=2))
+
+def _config_add_template(cfg: Dict[str, Any], name: Optional[str], path: Optional[str], description: Optional[str], **_: Any) -> None:
+    """Register a template, prompting for anything not given."""
+    from rich.prompt import Prompt
+
+    # Interactive mode if required values are not provided
+    if not name:
+        name = Prompt.ask("[cyan]Enter template name[/cyan]")
+        if not name:
+            raise typer.BadParameter("Template name is required")
+
+    if not path:
+        path = Prompt.ask("[cyan]Enter template path[/cyan]")
+        if not path:
+            raise typer.BadParameter("Template path is required")
+
+    if not description:
+        description = Prompt.ask(
+            "[cyan]Enter template description[/cyan] [dim](optional, press Enter to skip)[/dim]",
+            default="No description"
+        )
+
+    # Convert relative path to absolute path
+    template_path = Path(path)
+    if not template_path.is_absolute():
+        template_path = Path.cwd() / template_path
+    template_path = template_path.resolve()
+
+    # Validate path exists
+    if not template_path.exists():
+        console.print(f"[red]Error: Template path does not exist: {template_path}[/red]")
+        raise typer.Exit(1)
+
+    # Validate cookiecutter.json exists
+    cookiecutter_json = template_path / "cookiecutter.json"
+    if not cookiecutter_json.exists():
+        console.print(f"[red]Error: No cookiecutter.json found in {template_path}[/red]")
+        raise typer.Exit(1)
+
+    templates = cfg.setdefault("templates", {})
+    templates[name] = {
+        "path": str(template_path),
+        "defaults": {},
+        "description": description
+    }
+
+    console.print(f"[green]Added template '{name}' with path: {template_path}[/green]")
+    if description and description != "No description":
+        console.print(f"[green]Description: {description}[/green]")
+
+def _config_set_description(cfg: Dict[str, Any], name: Optional[str], description: Optional[str], **_: Any) -> None:
+    """Set a template's description."""
+    if not name:
+        name = typer.prompt("Enter the name of the template")
+    if not description:
+        description = typer.prompt("Enter the description of the template")
+
+    template_data = cfg.get("templates", {}).get(name)
+    if template_data is None:
+        raise typer.BadParameter(f"Template '{name}' not found")
+
+    template_data["description"] = description if description else "No description"
+    console.print(f"[green]Updated description for {name}[/green]")
+
+def _config_set_default(cfg: Dict[str, Any], name: Optional[str], key: Optional[str], value: Optional[str], **_: Any) -> None:
+    """Set a template-specific default after checking it against cookiecutter.json."""
+    # if not name or not key or value is None:
+    #     raise typer.BadParameter("--name, --key, and --value are required")
+
+    if not name:
+        name = typer.prompt("Enter the name of the template")
+    if not key:
+        key = typer.prompt("Enter the key of the template")
+    if not value:
+        value = typer.prompt("Enter the value of the template")
+
+    template_data = cfg.get("templates", {}).get(name)
+    if template_data is None:
+        raise typer.BadParameter(f"Template '{name}' not found")
+
+    template_path = template_data["path"]
+
+    # Verify key exists in cookiecutter.json
+    cookiecutter_config = load_cookiecutter_config(template_path)
+    if key not in cookiecutter_config:
+        raise typer.BadParameter(
+            f"Key '{key}' not found in cookiecutter.json. "
+            f"Available keys: {', '.join(cookiecutter_config.keys())}"
+        )
+
+    template_data.setdefault("defaults", {})[key] = value
+    console.print(f"[green]Set default for {name}:[/green] {key}={value}")
+
+def _config_set_global_default(cfg: Dict[str, Any], key: Optional[str], value: Optional[str], **_: Any) -> None:
+    """Set a default shared by all templates."""
+    # if not key or value is None:
+    #     raise typer.BadParameter("--key and --value are required")
+
+    if not key:
+        key = typer.prompt("Enter the key")
+    if not value:
+        value = typer.prompt("Enter the value")
+
+    global_defaults = cfg.setdefault("global_defaults", {})
+    global_defaults[key] = value
+    console.print(f"[green]Set global default:[/green] {key}={value}")
+
+def _config_remove_template(cfg: Dict[str, Any], name: Optional[str], **_: Any) -> None:
+    """Remove a template after confirmation."""
+    from rich.prompt import Confirm
+
+    if not name:
+        name = typer.prompt("Enter the name of the template")
+
+    templates = cfg.get("templates", {})
+    if name not in templates:
+        raise typer.BadParameter(f"Template '{name}' not found")
+
+    if not Confirm.ask(f"[yellow]Are you sure you want to remove the template '{name}'?[/yellow]"):
+        console.print("[red]Operation cancelled[/red]")
+        return
+
+    del templates[name]
+    console.print(f"[green]Removed template:[/green] {name}")
+
+def _config_remove_default(cfg: Dict[str, Any], name: Optional[str], key: Optional[str], **_: Any) -> None:
+    """Remove a template-specific default after confirmation."""
+    from rich.prompt import Confirm, Prompt
+
+    templates = cfg.get("templates", {})
+
+    # Interactive mode if flags not provided
+    if not name:
+        if not templates:
+            raise typer.BadParameter("No templates configured.")
+
+        _print_choices("Available templates", templates)
+        name = Prompt.ask("[cyan]Enter template name[/cyan]")
+
+    template_data = templates.get(name)
+    if template_data is None:
+        raise typer.BadParameter(f"Template '{name}' not found")
+    defaults = template_data.get("defaults", {})
+
+    if not key:
+        if not defaults:
+            raise typer.BadParameter(f"No defaults configured for template '{name}'")
+
+        _print_choices("Available defaults", (f"{k} = {v}" for k, v in defaults.items()))
+        key = Prompt.ask("[cyan]Enter default key to remove[/cyan]")
+
+    if key not in defaults:
+        raise typer.BadParameter(f"Default '{key}' not found in template '{name}'")
+
+    if Confirm.ask(f"[yellow]Are you sure you want to remove default '{key}' from template '{name}'?[/yellow]"):
+        del defaults[key]
+        console.print(f"[green]Removed default from {name}:[/green] {key}")
+
+def _config_remove_global_default(cfg: Dict[str, Any], key: Optional[str], **_: Any) -> None:
+    """Remove a global default after confirmation."""
+    from rich.prompt import Confirm, Prompt
+
+    global_defaults = cfg.get("global_defaults", {})
+
+    # Interactive mode if flags not provided
+    if not key:
+        if not global_defaults:
+            raise typer.BadParameter("No global defaults configured.")
+
+        _print_choices("Available global defaults", (f"{k} = {v}" for k, v in global_defaults.items()))
+        key = Prompt.ask("[cyan]Enter global default key to remove[/cyan]")
+
+    if key not in global_defaults:
+        raise typer.BadParameter(f"Global default '{key}' not found")
+
+    if Confirm.ask(f"[yellow]Are you sure you want to remove global default '{key}'?[/yellow]"):
+        del global_defaults[key]
+        console.print(f"[green]Removed global default:[/green] {key}")
+
+# Handlers for `wanpc config ACTION`; each takes the loaded config plus the command's options
+# and mutates it in place; config() writes it back once if anything changed
+_CONFIG_ACTIONS: Dict[str, Callable[..., None]] = {
+    "config-path": _config_config_path,
+    "show": _config_show,
+    "add-template": _config_add_template,
+    "set-description": _config_set_description,
+    "set-default": _config_set_default,
+    "set-global-default": _config_set_global_default,
+    "remove-template": _config_remove_template,
+    "remove-default": _config_remove_default,
+    "remove-global-default": _config_remove_global_default,
+}
+
 @app.command()
 def config(
     action: str = typer.Argument(
@@ -596,221 +904,18 @@ def config(
     \tthe template and global levels.\n
     \n\tTemplate defaults take precedence over global defaults."""
     try:
-        cfg = get_config()
-
-        if action == "config-path":
-            console.print("\n[bold]Configuration file location:[/bold]")
-            config_file = Config().config_file
-            console.print(f"[cyan]{config_file}[/cyan]")
-            
-            if config_file.exists():
-                console.print("[green]Status: File exists[/green]")
-                size = config_file.stat().st_size
-                console.print(f"Size: {size} bytes")
-            else:
-                console.print("[yellow]Status: File does not exist yet[/yellow]")
-                console.print("A new configuration file will be created when needed")
-            return
-
-        if action == "show":
-            if not cfg:
-                console.print("[yellow]No configuration found.[/yellow]")
-                return
-            console.print("\n[bold]Current Configuration:[/bold]")
-            console.print(json.dumps(cfg, indent=2))
-            return
-
-        if action == "add-template":
-            # Interactive mode if required values are not provided
-            if not name:
-                name = Prompt.ask("[cyan]Enter template name[/cyan]")
-                if not name:
-                    raise typer.BadParameter("Template name is required")
-
-            if not path:
-                path = Prompt.ask("[cyan]Enter template path[/cyan]")
-                if not path:
-                    raise typer.BadParameter("Template path is required")
-
-            if not description:
-                description = Prompt.ask(
-                    "[cyan]Enter template description[/cyan] [dim](optional, press Enter to skip)[/dim]",
-                    default="No description"
-                )
-
-            # Convert relative path to absolute path
-            template_path = Path(path)
-            if not template_path.is_absolute():
-                template_path = Path.cwd() / template_path
-            template_path = template_path.resolve()
-            
-            # Validate path exists
-            if not template_path.exists():
-                console.print(f"[red]Error: Template path does not exist: {template_path}[/red]")
-                raise typer.Exit(1)
-                
-            # Validate cookiecutter.json exists
-            cookiecutter_json = template_path / "cookiecutter.json"
-            if not cookiecutter_json.exists():
-                console.print(f"[red]Error: No cookiecutter.json found in {template_path}[/red]")
-                raise typer.Exit(1)
-
-            templates = cfg.setdefault("templates", {})
-            templates[name] = {
-                "path": str(template_path),
-                "defaults": {},
-                "description": description
-            }
-
-            save_config(cfg)
-            console.print(f"[green]Added template '{name}' with path: {template_path}[/green]")
-            if description and description != "No description":
-                console.print(f"[green]Description: {description}[/green]")
-            return
-
-        if action == "set-description":
-            if not name:
-                name = typer.prompt("Enter the name of the template")
-            if not description:
-                description = typer.prompt("Enter the description of the template")
-
-            templates = cfg.get("templates", {})
-            if name not in templates:
-                raise typer.BadParameter(f"Template '{name}' not found")
-
-            templates[name]["description"] = description if description else "No description"
-            save_config(cfg)
-            console.print(f"[green]Updated description for {name}[/green]")
-            return
-
-        if action == "set-default":
-            # if not name or not key or value is None:
-            #     raise typer.BadParameter("--name, --key, and --value are required")
-
-            if not name:
-                name = typer.prompt("Enter the name of the template")
-            if not key:
-                key = typer.prompt("Enter the key of the template")
-            if not value:
-                value = typer.prompt("Enter the value of the template")
-
-            templates = cfg.get("templates", {})
-            if name not in templates:
-                raise typer.BadParameter(f"Template '{name}' not found")
-
-            template_data = templates[name]
-            template_path = template_data["path"]
-
-            # Verify key exists in cookiecutter.json
-            cookiecutter_config = load_cookiecutter_config(template_path)
-            if key not in cookiecutter_config:
-                raise typer.BadParameter(
-                    f"Key '{key}' not found in cookiecutter.json. "
-                    f"Available keys: {', '.join(cookiecutter_config.keys())}"
-                )
-
-            template_data.setdefault("defaults", {})[key] = value
-            save_config(cfg)
-            console.print(f"[green]Set default for {name}:[/green] {key}={value}")
-            return
-
-        if action == "set-global-default":
-            # if not key or value is None:
-            #     raise typer.BadParameter("--key and --value are required")
-
-            if not key:
-                key = typer.prompt("Enter the key")
-            if not value:
-                value = typer.prompt("Enter the value")
-
-            global_defaults = cfg.setdefault("global_defaults", {})
-            global_defaults[key] = value
-            save_config(cfg)
-            console.print(f"[green]Set global default:[/green] {key}={value}")
-            return
-
-        if action == "remove-template":
-            if not name:
-                name = typer.prompt("Enter the name of the template")
-            
-
-            templates = cfg.get("templates", {})
-            if name not in templates:
-                raise typer.BadParameter(f"Template '{name}' not found")
-            
-            if not Confirm.ask(f"[yellow]Are you sure you want to remove the template '{name}'?[/yellow]"):
-                console.print("[red]Operation cancelled[/red]")
-                return
-
-            del templates[name]
-            save_config(cfg)
-            console.print(f"[green]Removed template:[/green] {name}")
-            return
-
-        if action == "remove-default":
-            # Interactive mode if flags not provided
-            if not name:
-                templates = cfg.get("templates", {})
-                if not templates:
-                    raise typer.BadParameter("No templates configured.")
-                
-                console.print("\n[bold]Available templates:[/bold]")
-                for name in templates:
-                    console.print(f"  - {name}")
-                name = Prompt.ask("[cyan]Enter template name[/cyan]")
-
-            templates = cfg.get("templates", {})
-            if name not in templates:
-                raise typer.BadParameter(f"Template '{name}' not found")
-
-            if not key:
-                defaults = templates[name].get("defaults", {})
-                if not defaults:
-                    raise typer.BadParameter(f"No defaults configured for template '{name}'")
-                
-                console.print("\n[bold]Available defaults:[/bold]")
-                for key, value in defaults.items():
-                    console.print(f"  - {key} = {value}")
-                key = Prompt.ask("[cyan]Enter default key to remove[/cyan]")
-
-            defaults = templates[name].get("defaults", {})
-            if key not in defaults:
-                raise typer.BadParameter(f"Default '{key}' not found in template '{name}'")
-
-            if Confirm.ask(f"[yellow]Are you sure you want to remove default '{key}' from template '{name}'?[/yellow]"):
-                del defaults[key]
-                save_config(cfg)
-                console.print(f"[green]Removed default from {name}:[/green] {key}")
-            return
-
-        if action == "remove-global-default":
-            # Interactive mode if flags not provided
-            if not key:
-                global_defaults = cfg.get("global_defaults", {})
-                if not global_defaults:
-                    raise typer.BadParameter("No global defaults configured.")
-                
-                console.print("\n[bold]Available global defaults:[/bold]")
-                for key, value in global_defaults.items():
-                    console.print(f"  - {key} = {value}")
-                key = Prompt.ask("[cyan]Enter global default key to remove[/cyan]")
-
-            global_defaults = cfg.get("global_defaults", {})
-            if key not in global_defaults:
-                raise typer.BadParameter(f"Global default '{key}' not found")
-
-            if Confirm.ask(f"[yellow]Are you sure you want to remove global default '{key}'?[/yellow]"):
-                del global_defaults[key]
-                save_config(cfg)
-                console.print(f"[green]Removed global default:[/green] {key}")
-            return
-
-        raise typer.BadParameter(
-            f"Invalid action: {action}. Use --help to see available actions."
-        )
+        handler = _CONFIG_ACTIONS.get(action)
+        if handler is None:
+            raise typer.BadParameter(
+                f"Invalid action: {action}. Use --help to see available actions."
+            )
+        with config_transaction() as cfg:
+            handler(cfg, name=name, path=path, key=key, value=value, description=description)
 
-    except Exception as e:
-        raise typer.Exit(f"Error managing config: {str(e)}")
+    except (typer.BadParameter, PackageCreationError, OSError) as e:
+        # Validation and I/O failures; typer.Exit from a handler passes through untouched
+        console.print(f"[red]Error managing config: {e}[/red]")
+        raise typer.Exit(1)
 
 def main():
     """Entry point for the CLI."""
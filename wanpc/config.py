@@ -1,10 +1,12 @@
 """Configuration management for wanpc."""
 
-import subprocess
+import copy
+import os
+import sys
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
-
-import toml
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from .exceptions import PackageCreationError
 from .logger import get_logger
@@ -12,15 +14,34 @@ from .logger import get_logger
 logger = get_logger()
 
 
+@lru_cache(maxsize=8)
+def _cached_load(path: str, mtime_ns: int, size: int, ino: int) -> Dict[str, Any]:
+    """Parse a TOML file, cached per path, modification time, size and inode."""
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        import tomli as tomllib
+
+    # One read for the whole file, then parse from memory
+    return tomllib.loads(Path(path).read_bytes().decode("utf-8"))
+
+
 class Config:
     """Handle wanpc configuration."""
 
-    def __init__(self):
-        """Initialize the configuration."""
+    def __init__(self, load: bool = True):
+        """
+        Initialize the configuration.
+
+        Args:
+            load: Read the config file now; pass False when the contents are about to be replaced
+        """
         self.config_dir = Path.home() / ".wanpc"
         self.config_file = self.config_dir / "config.toml"
         self._config: Dict[str, Any] = {}
-        self._load_config()
+        self._resolved_paths: Dict[str, Path] = {}
+        if load:
+            self._load_config()
 
     def load(self) -> None:
         """Load configuration from file."""
@@ -33,12 +54,25 @@ class Config:
         Raises:
             PackageCreationError: If config file exists but cannot be loaded
         """
-        if self.config_file.exists():
-            try:
-                self._config = toml.load(self.config_file)
-            except Exception as e:
-                logger.error(f"Failed to load config file: {e}")
-                raise PackageCreationError(f"Failed to load config file: {e}")
+        try:
+            # One stat both checks existence and keys the parse cache
+            st = self.config_file.stat()
+        except FileNotFoundError:
+            # A deleted file means an empty config, not whatever was loaded last
+            self._config = {}
+            return
+        except OSError as e:
+            logger.error(f"Failed to load config file: {e}")
+            raise PackageCreationError(f"Failed to load config file: {e}")
+        try:
+            # An unchanged file reuses the cached parse; the inode tells apart files
+            # swapped in by os.replace within the same mtime tick. The parse is shared,
+            # so always hand this instance a fresh copy, discarding unsaved edits.
+            parsed = _cached_load(str(self.config_file), st.st_mtime_ns, st.st_size, st.st_ino)
+            self._config = copy.deepcopy(parsed)
+        except Exception as e:
+            logger.error(f"Failed to load config file: {e}")
+            raise PackageCreationError(f"Failed to load config file: {e}")
 
     def _save_config(self) -> None:
         """
@@ -47,14 +81,50 @@ class Config:
         Raises:
             PackageCreationError: If config cannot be saved
         """
+        import tempfile
+
+        import tomli_w
+
+        tmp_file = None
         try:
+            data = tomli_w.dumps(self._config).encode("utf-8")
             self.config_dir.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, "w") as f:
-                toml.dump(self._config, f)
+            # Write a uniquely named file next to the target, flush it to disk and swap
+            # it in, so readers and concurrent writers never see a partial file
+            fd, tmp_file = tempfile.mkstemp(dir=self.config_dir, prefix=".config.", suffix=".toml")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
+            tmp_file = None
         except Exception as e:
+            if tmp_file is not None:
+                Path(tmp_file).unlink(missing_ok=True)
             logger.error(f"Failed to save config file: {e}")
             raise PackageCreationError(f"Failed to save config file: {e}")
 
+    def template_path(self, name: str) -> Optional[Path]:
+        """
+        Get the resolved path of a configured template.
+
+        Resolved paths are cached per raw path string, so editing a template's
+        path in the config is picked up without invalidating anything.
+
+        Args:
+            name: Name of the template
+
+        Returns:
+            Absolute template path, or None if the template or its path is missing
+        """
+        raw = self._config.get("templates", {}).get(name, {}).get("path")
+        if not raw:
+            return None
+        resolved = self._resolved_paths.get(raw)
+        if resolved is None:
+            resolved = self._resolved_paths[raw] = Path(raw).expanduser().resolve()
+        return resolved
+
     @property
     def default_author(self) -> Optional[str]:
         """Get the default author name."""
@@ -63,9 +133,7 @@ class Config:
     @default_author.setter
     def default_author(self, value: str) -> None:
         """Set the default author name."""
-        if "user" not in self._config:
-            self._config["user"] = {}
-        self._config["user"]["name"] = value
+        self._config.setdefault("user", {})["name"] = value
         self._save_config()
 
     @property
@@ -76,42 +144,46 @@ class Config:
     @default_email.setter
     def default_email(self, value: str) -> None:
         """Set the default author email."""
-        if "user" not in self._config:
-            self._config["user"] = {}
-        self._config["user"]["email"] = value
+        self._config.setdefault("user", {})["email"] = value
         self._save_config()
 
     @staticmethod
-    def get_merged_defaults(config_data: Dict[str, Any], template_name: str) -> Dict[str, Any]:
+    def get_merged_defaults(config_data: Dict[str, Any], template_name: str, strict: bool = True) -> Dict[str, Any]:
         """
         Get merged defaults, with template defaults taking precedence over global defaults.
 
         Args:
             config_data: Configuration data dictionary
             template_name: Name of the template
+            strict: Raise for an unknown template instead of returning only the global defaults
 
         Returns:
             Dictionary of merged defaults
 
         Raises:
-            KeyError: If template doesn't exist in config
+            KeyError: If strict and template doesn't exist in config
         """
-        if template_name not in config_data.get("templates", {}):
-            raise KeyError(f"Template '{template_name}' not found in config")
+        template_data = config_data.get("templates", {}).get(template_name)
+        if template_data is None:
+            if strict:
+                raise KeyError(f"Template '{template_name}' not found in config")
+            template_data = {}
 
-        # Start with global defaults
         global_defaults = config_data.get("global_defaults", {})
         if not isinstance(global_defaults, dict):
             global_defaults = {}
-        merged = global_defaults.copy()
-
-        # Override with template-specific defaults
-        template_defaults = config_data["templates"][template_name].get("defaults", {})
+        template_defaults = template_data.get("defaults", {})
         if not isinstance(template_defaults, dict):
             template_defaults = {}
-        merged.update(template_defaults)
 
-        return merged
+        # With one side empty (common for fresh templates) the merge is just a copy
+        if not template_defaults:
+            return global_defaults.copy()
+        if not global_defaults:
+            return template_defaults.copy()
+
+        # Template-specific defaults override global ones
+        return global_defaults | template_defaults
 
     def get_git_config(self) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -120,43 +192,91 @@ class Config:
         Returns:
             Tuple of (name, email) from git config, or (None, None) if not found
         """
+        import subprocess
+
         try:
-            name = subprocess.run(
-                ["git", "config", "--get", "user.name"],
+            # One git process for both keys; output is "<key> <value>" per line
+            output = subprocess.run(
+                ["git", "config", "--get-regexp", r"^user\.(name|email)$"],
                 capture_output=True,
                 text=True,
                 check=False,
-            ).stdout.strip()
+            ).stdout
 
-            email = subprocess.run(
-                ["git", "config", "--get", "user.email"],
-                capture_output=True,
-                text=True,
-                check=False,
-            ).stdout.strip()
+            values: Dict[str, str] = {}
+            for line in output.splitlines():
+                key, _, value = line.partition(" ")
+                values[key] = value.strip()  # Later scopes override earlier ones, as with --get
 
-            return name or None, email or None
+            return values.get("user.name") or None, values.get("user.email") or None
 
         except Exception as e:
             logger.warning(f"Failed to get git config: {e}")
             return None, None
 
 
+_SHARED: Optional[Config] = None
+
+def shared_config(load: bool = True) -> Config:
+    """
+    Return the process-wide Config for the current user.
+
+    The instance is rebuilt if the home directory changed; otherwise the file
+    is only re-parsed once it has changed on disk.
+
+    Args:
+        load: Refresh from the file; pass False when its contents are about to be replaced
+
+    Returns:
+        The shared Config instance
+    """
+    global _SHARED
+    if _SHARED is None or _SHARED.config_file != Path.home() / ".wanpc" / "config.toml":
+        _SHARED = Config(load=load)
+    elif load:
+        _SHARED.load()
+    return _SHARED
+
+@contextmanager
+def config_transaction() -> Iterator[Dict[str, Any]]:
+    """
+    Yield the shared configuration and write it back once on exit.
+
+    The file is only written if the configuration changed, and not at all if
+    the block raises, so a command can mutate freely and pay for one save.
+
+    Yields:
+        The configuration dictionary to read and mutate
+    """
+    config = shared_config()
+    cfg = config._config
+    before = copy.deepcopy(cfg)
+    try:
+        yield cfg
+    except BaseException:
+        # Keep the shared instance in step with the file it was not written to
+        config._config = before
+        raise
+    # Track the yielded dict: a load() inside the block replaces config._config
+    if cfg != before:
+        config._config = cfg
+        config._save_config()
+
 def load_config() -> Dict[str, Any]:
-    """Load and return the configuration."""
-    config = Config()
+    """Load and return a copy of the configuration."""
+    config = shared_config()
     if not config._config:
-        # Create default config if none exists
-        config._config = {
+        # Start from the default structure; the file is only written on the first save
+        return {
             "templates": {},
             "global_defaults": {}
         }
-        config._save_config()
-    return config._config
+    # Callers own the result, so edits don't leak into the shared instance
+    return copy.deepcopy(config._config)
 
 def save_config(cfg: Dict[str, Any]) -> None:
     """Save the configuration."""
-    config = Config()
+    config = shared_config(load=False)
     # Ensure structure exists
     if "templates" not in cfg:
         cfg["templates"] = {}
@@ -167,12 +287,4 @@ def save_config(cfg: Dict[str, Any]) -> None:
 
 def get_merged_defaults(cfg: Dict[str, Any], template_name: str) -> Dict[str, Any]:
     """Get merged defaults, with template defaults taking precedence over global defaults."""
-    global_defaults = cfg.get("global_defaults", {})
-    template_defaults = cfg.get("templates", {}).get(template_name, {}).get("defaults", {})
-    
-    # Start with global defaults
-    merged = global_defaults.copy()
-    # Update with template defaults (these take precedence)
-    merged.update(template_defaults)
-    
-    return merged
+    return Config.get_merged_defaults(cfg, template_name, strict=False)
@@ -1,10 +1,18 @@
 """Logging utilities for wanpc."""
 
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 
 LOGGER_NAME = "wanpc"
 
+_VALID_LEVELS = frozenset({logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL})
+
+# Formatters are stateless, so every handler can share one
+_FORMATTER = logging.Formatter("[%(levelname)s] %(message)s")
+
+# (level, log_file, handlers) from the last setup_logging call
+_CONFIGURED: Optional[Tuple[int, Optional[str], Tuple[logging.Handler, ...]]] = None
+
 def get_logger() -> logging.Logger:
     """
     Get the global logger instance.
@@ -26,8 +34,7 @@ def set_verbose(verbose: bool) -> None:
     logger.setLevel(logging.DEBUG if verbose else logging.INFO)
     if not logger.handlers:
         ch = logging.StreamHandler()
-        formatter = logging.Formatter("[%(levelname)s] %(message)s")
-        ch.setFormatter(formatter)
+        ch.setFormatter(_FORMATTER)
         logger.addHandler(ch)
 
 
@@ -42,33 +49,40 @@ def setup_logging(level: int = logging.INFO, log_file: Optional[str] = None) ->
     Returns:
         The configured logger instance
     """
+    global _CONFIGURED
     logger = get_logger()
+
+    # Set level (default to INFO for invalid levels)
+    if level not in _VALID_LEVELS:
+        level = logging.INFO
+
+    # Nothing to do if this exact setup is still in place
+    if _CONFIGURED == (level, log_file, tuple(logger.handlers)) and logger.level == level:
+        return logger
     
-    # Reset handlers
+    # Reset handlers, closing them so repeated calls don't leak open log files
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+        handler.close()
     
-    # Set level (default to INFO for invalid levels)
-    if level not in (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL):
-        level = logging.INFO
     logger.setLevel(level)
     
     # Add stream handler
     stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(levelname)s] %(message)s")
-    stream_handler.setFormatter(formatter)
+    stream_handler.setFormatter(_FORMATTER)
     logger.addHandler(stream_handler)
     
     # Add file handler if specified
     if log_file:
         try:
             file_handler = logging.FileHandler(log_file)
-            file_handler.setFormatter(formatter)
+            file_handler.setFormatter(_FORMATTER)
             logger.addHandler(file_handler)
         except (OSError, IOError):
             # Log but don't fail if file handler creation fails
             logger.warning(f"Failed to create log file: {log_file}")
     
+    _CONFIGURED = (level, log_file, tuple(logger.handlers))
     return logger
 
 